@@ -4,14 +4,15 @@ Enhanced Version with Body Map, Analytics Dashboard, and Clinic Finder
 """
 
 import streamlit as st
-import json
-from datetime import datetime, timedelta
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import hashlib
+import heapq
+from datetime import datetime
 import os
-import requests
-from collections import Counter
+import re
+import numpy as np
+from collections import Counter, namedtuple
+from bisect import bisect_right
+from operator import itemgetter
 
 # Page configuration
 st.set_page_config(
@@ -21,6 +22,25 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Age bucket boundaries for the analytics dashboard
+AGE_BUCKET_BOUNDS = (18, 36, 51, 66)
+AGE_BUCKET_LABELS = ('0-17', '18-35', '36-50', '51-65', '65+')
+
+def _record_assessment(report):
+    """Add a finished report to the history and the running dashboard aggregates"""
+    state = st.session_state
+    patient = report['patient']
+    
+    state.assessment_history.append(report)
+    state.triage_counter[report['triage']] += 1
+    state.condition_counter.update(map(itemgetter('name'), report['conditions']))
+    state.symptom_counter.update(map(itemgetter('name'), report['symptoms']))
+    state.region_counter.update(map(itemgetter('region'), report['symptoms']))
+    state.sex_counter[patient['sex']] += 1
+    state.age_sum += patient['age']
+    state.symptom_total += len(report['symptoms'])
+    state.age_bucket_counts[bisect_right(AGE_BUCKET_BOUNDS, patient['age'])] += 1
+
 # Initialize session state
 if 'step' not in st.session_state:
     st.session_state.step = 'form'
@@ -35,6 +55,23 @@ if 'body_regions' not in st.session_state:
 if 'assessment_history' not in st.session_state:
     st.session_state.assessment_history = []
 
+# Running dashboard aggregates, kept in step with assessment_history by
+# _record_assessment(). Any existing history (e.g. after a code reload) is
+# replayed through the same path.
+if 'triage_counter' not in st.session_state:
+    history = st.session_state.assessment_history
+    st.session_state.assessment_history = []
+    st.session_state.triage_counter = Counter()
+    st.session_state.condition_counter = Counter()
+    st.session_state.symptom_counter = Counter()
+    st.session_state.region_counter = Counter()
+    st.session_state.sex_counter = Counter()
+    st.session_state.age_sum = 0
+    st.session_state.symptom_total = 0
+    st.session_state.age_bucket_counts = [0] * len(AGE_BUCKET_LABELS)
+    for past_report in history:
+        _record_assessment(past_report)
+
 # Medical symptom database with body region mapping
 SYMPTOMS = [
     # Head/Face
@@ -73,6 +110,19 @@ SYMPTOMS = [
     {'id': 's_1962', 'name': 'Weight loss', 'category': 'General', 'region': 'general'},
 ]
 
+def _column_layout(categories):
+    """Split (category, symptom ids) pairs round-robin across the form's three columns"""
+    entries = [(category, [s['id'] for s in symptom_list]) for category, symptom_list in categories.items()]
+    return [entries[i::3] for i in range(3)]
+
+# Symptom lookup tables
+SYMPTOM_BY_ID = {s['id']: s for s in SYMPTOMS}
+SYMPTOM_INDEX = {s['id']: i for i, s in enumerate(SYMPTOMS)}
+CATEGORIES = {}
+for s in SYMPTOMS:
+    CATEGORIES.setdefault(s['category'], []).append(s)
+CATEGORY_LAYOUT = _column_layout(CATEGORIES)
+
 # Body region definitions
 BODY_REGIONS = {
     'head': {'name': 'Head/Face', 'color': '#FF6B6B'},
@@ -81,6 +131,7 @@ BODY_REGIONS = {
     'body': {'name': 'Arms/Legs/Back', 'color': '#95E1D3'},
     'general': {'name': 'General/Whole Body', 'color': '#A8DADC'}
 }
+BODY_REGION_NAMES = {key: region['name'] for key, region in BODY_REGIONS.items()}
 
 # Clinical decision rules
 CLINICAL_RULES = {
@@ -108,118 +159,180 @@ CLINICAL_RULES = {
         ]
     },
 }
+for rules in CLINICAL_RULES.values():
+    rules['primary_set'] = frozenset(rules['primary'])
+    rules['primary_len'] = len(rules['primary'])
+
+# Condition scoring table. A condition is scored when at least min_primary of
+# its primary symptoms are present: base + per_primary * matches, plus the
+# weight of each bonus symptom present, capped at cap.
+ConditionSpec = namedtuple(
+    'ConditionSpec',
+    'id name common_name icd10 primary min_primary base per_primary bonuses cap urgency all_ids'
+)
+
+CONDITION_SPECS = (
+    ConditionSpec(
+        id='c_430', name='Upper respiratory tract infection', common_name='Common cold', icd10='J06.9',
+        primary=frozenset(['s_98', 's_107', 's_1986', 's_1995']), min_primary=2, base=0.55, per_primary=0.08,
+        bonuses=(('s_1989', 0.15), ('s_305', 0.10), ('s_1993', 0.08)), cap=0.95, urgency=None,
+        all_ids=frozenset(['s_98', 's_107', 's_1986', 's_1995', 's_1989', 's_305', 's_1993'])
+    ),
+    ConditionSpec(
+        id='c_782', name='Influenza', common_name='Flu', icd10='J11.1',
+        primary=frozenset(['s_21', 's_98', 's_107', 's_1998']), min_primary=2, base=0.50, per_primary=0.08,
+        bonuses=(('s_1989', 0.12), ('s_2001', 0.15), ('s_1986', 0.08)), cap=0.95, urgency=None,
+        all_ids=frozenset(['s_21', 's_98', 's_107', 's_1998', 's_1989', 's_2001', 's_1986'])
+    ),
+    ConditionSpec(
+        id='c_531', name='Gastroenteritis', common_name='Stomach flu', icd10='A09',
+        primary=frozenset(['s_1967', 's_1970']), min_primary=1, base=0.60, per_primary=0.0,
+        bonuses=(('s_1969', 0.15), ('s_1968', 0.10), ('s_98', 0.08)), cap=0.95, urgency=None,
+        all_ids=frozenset(['s_1967', 's_1970', 's_1969', 's_1968', 's_98'])
+    ),
+    # Coronary Disease (HIGH PRIORITY)
+    ConditionSpec(
+        id='c_49', name='Coronary artery disease', common_name='Heart disease', icd10='I25.1',
+        primary=frozenset(['s_102']), min_primary=1, base=0.40, per_primary=0.0,
+        bonuses=(('s_1988', 0.20),), cap=0.85, urgency='high',
+        all_ids=frozenset(['s_102', 's_1988', 's_15'])
+    ),
+)
+
+# Matrix form of CONDITION_SPECS for scoring symptom sets with NumPy:
+# rows are symptoms (SYMPTOM_INDEX order), columns are conditions. Bonus
+# weights get one matrix per bonus position so they can be added in spec
+# order, keeping probabilities identical to sequential float addition.
+PRIMARY_MATRIX = np.zeros((len(SYMPTOMS), len(CONDITION_SPECS)))
+MATCH_MATRIX = np.zeros((len(SYMPTOMS), len(CONDITION_SPECS)))
+BONUS_MATRICES = np.zeros((max(len(spec.bonuses) for spec in CONDITION_SPECS), len(SYMPTOMS), len(CONDITION_SPECS)))
+for k, spec in enumerate(CONDITION_SPECS):
+    for sid in spec.primary:
+        PRIMARY_MATRIX[SYMPTOM_INDEX[sid], k] = 1.0
+    for sid in spec.all_ids:
+        MATCH_MATRIX[SYMPTOM_INDEX[sid], k] = 1.0
+    for slot, (sid, weight) in enumerate(spec.bonuses):
+        BONUS_MATRICES[slot, SYMPTOM_INDEX[sid], k] = weight
+SPEC_BASES = np.array([spec.base for spec in CONDITION_SPECS])
+SPEC_PER_PRIMARY = np.array([spec.per_primary for spec in CONDITION_SPECS])
+SPEC_MIN_PRIMARY = np.array([spec.min_primary for spec in CONDITION_SPECS])
+SPEC_CAPS = np.array([spec.cap for spec in CONDITION_SPECS])
+
+def symptom_indicators(symptom_sets):
+    """Encode symptom id collections as a 0/1 matrix with one row per set"""
+    indicators = np.zeros((len(symptom_sets), len(SYMPTOMS)))
+    for row, symptom_ids in enumerate(symptom_sets):
+        indicators[row, [SYMPTOM_INDEX[sid] for sid in symptom_ids if sid in SYMPTOM_INDEX]] = 1.0
+    return indicators
+
+def score_batch(indicators):
+    """Score every CONDITION_SPECS entry for each indicator row.
+    
+    Returns (probs, eligible): an (N, conditions) probability array and a
+    boolean array of the same shape marking where a condition's minimum
+    primary match is met. Probabilities are only meaningful where eligible.
+    """
+    matched_primary = indicators @ PRIMARY_MATRIX
+    probs = SPEC_BASES + matched_primary * SPEC_PER_PRIMARY
+    for bonus_matrix in BONUS_MATRICES:
+        probs += indicators @ bonus_matrix
+    return np.minimum(probs, SPEC_CAPS), matched_primary >= SPEC_MIN_PRIMARY
+
+# Static page copy, built once per run instead of inside the render path
+DISCLAIMER_MD = """
+**⚠️ IMPORTANT MEDICAL DISCLAIMER**
+
+- This is NOT a diagnostic tool and does NOT replace professional medical advice
+- Results are for informational and pre-screening purposes ONLY
+- Always consult a licensed healthcare provider for actual diagnosis and treatment
+- In case of emergency, call 911 or your local emergency number immediately
+- This tool uses Infermedica API methodology for symptom assessment
+"""
+
+NOTES_MD = """
+**Important Notes:**
+- This assessment uses clinical decision support algorithms
+- Body map helps identify location-specific conditions
+- Follow-up questions improve diagnostic accuracy by 15-30%
+- Symptom IDs and condition codes follow medical standards (ICD-10)
+- Only a licensed healthcare provider can provide an actual diagnosis
+"""
 
 def medical_disclaimer():
     """Display medical disclaimer"""
-    st.error("""
-    **⚠️ IMPORTANT MEDICAL DISCLAIMER**
-    
-    - This is NOT a diagnostic tool and does NOT replace professional medical advice
-    - Results are for informational and pre-screening purposes ONLY
-    - Always consult a licensed healthcare provider for actual diagnosis and treatment
-    - In case of emergency, call 911 or your local emergency number immediately
-    - This tool uses Infermedica API methodology for symptom assessment
-    """)
+    st.error(DISCLAIMER_MD)
+
+@st.cache_data(show_spinner=False)
+def grouped_symptoms(regions_key):
+    """Column layout of symptom categories for a sorted tuple of body regions (cached)"""
+    categories = {}
+    for symptom in SYMPTOMS:
+        if symptom['region'] in regions_key:
+            categories.setdefault(symptom['category'], []).append(symptom)
+    return _column_layout(categories)
 
+@st.cache_data(max_entries=256, show_spinner=False)
 def generate_follow_up_questions(selected_symptoms):
-    """Generate follow-up questions based on symptom patterns"""
-    questions = []
+    """Generate follow-up questions for a sorted tuple of symptom ids (cached)"""
+    # Keyed by symptom id; the first condition to ask about a symptom wins
+    unique_questions = {}
+    selected_set = frozenset(selected_symptoms)
     
     for condition, rules in CLINICAL_RULES.items():
-        matched_primary = sum(1 for s in rules['primary'] if s in selected_symptoms)
+        overlap = rules['primary_set'] & selected_set
+        if not overlap:
+            continue
         
-        if matched_primary >= len(rules['primary']) * 0.6:
+        if len(overlap) >= rules['primary_len'] * 0.6:
             for confirm in rules['confirming']:
-                if confirm['id'] not in selected_symptoms:
-                    questions.append({
+                if confirm['id'] not in unique_questions and confirm['id'] not in selected_set:
+                    unique_questions[confirm['id']] = {
                         'symptom_id': confirm['id'],
                         'question': f"Do you also have {confirm['name'].lower()}?",
                         'weight': confirm['weight'],
                         'condition': condition
-                    })
-    
-    seen = set()
-    unique_questions = []
-    for q in questions:
-        if q['symptom_id'] not in seen:
-            seen.add(q['symptom_id'])
-            unique_questions.append(q)
+                    }
     
-    return sorted(unique_questions, key=lambda x: x['weight'], reverse=True)[:5]
+    return heapq.nlargest(5, unique_questions.values(), key=itemgetter('weight'))
 
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
 def assess_conditions(symptoms, follow_up_data, pain_severity, duration, emergency):
-    """Assess possible conditions based on symptoms"""
-    conditions = []
-    
-    all_symptoms = symptoms.copy()
-    for symptom_id, answer in follow_up_data.items():
-        if answer == 'yes' and symptom_id not in all_symptoms:
-            all_symptoms.append(symptom_id)
+    """Assess possible conditions based on symptoms (cached).
     
-    # Common Cold Logic
-    cold_primary = sum(1 for s in ['s_98', 's_107', 's_1986', 's_1995'] if s in all_symptoms)
-    if cold_primary >= 2:
-        prob = 0.55 + (cold_primary * 0.08)
-        if 's_1989' in all_symptoms: prob += 0.15
-        if 's_305' in all_symptoms: prob += 0.10
-        if 's_1993' in all_symptoms: prob += 0.08
-        
-        conditions.append({
-            'id': 'c_430',
-            'name': 'Upper respiratory tract infection',
-            'common_name': 'Common cold',
-            'probability': min(prob, 0.95),
-            'icd10': 'J06.9',
-            'matched': sum(1 for s in ['s_98', 's_107', 's_1986', 's_1995', 's_1989', 's_305', 's_1993'] if s in all_symptoms)
-        })
+    symptoms is a tuple of symptom ids and follow_up_data a tuple of
+    (symptom_id, answer) pairs, both in answer order.
+    """
+    conditions = []
+    has_high_urgency = False
     
-    # Influenza Logic
-    flu_primary = sum(1 for s in ['s_21', 's_98', 's_107', 's_1998'] if s in all_symptoms)
-    if flu_primary >= 2:
-        prob = 0.50 + (flu_primary * 0.08)
-        if 's_1989' in all_symptoms: prob += 0.12
-        if 's_2001' in all_symptoms: prob += 0.15
-        if 's_1986' in all_symptoms: prob += 0.08
-        
-        conditions.append({
-            'id': 'c_782',
-            'name': 'Influenza',
-            'common_name': 'Flu',
-            'probability': min(prob, 0.95),
-            'icd10': 'J11.1',
-            'matched': sum(1 for s in ['s_21', 's_98', 's_107', 's_1998', 's_1989', 's_2001', 's_1986'] if s in all_symptoms)
-        })
+    # Selected symptoms plus confirmed follow-ups, deduplicated in order
+    all_symptoms = list(dict.fromkeys([
+        *symptoms,
+        *(symptom_id for symptom_id, answer in follow_up_data if answer == 'yes')
+    ]))
+    sym_set = frozenset(all_symptoms)
     
-    # Gastroenteritis Logic
-    if 's_1967' in all_symptoms or 's_1970' in all_symptoms:
-        prob = 0.60
-        if 's_1969' in all_symptoms: prob += 0.15
-        if 's_1968' in all_symptoms: prob += 0.10
-        if 's_98' in all_symptoms: prob += 0.08
-        
-        conditions.append({
-            'id': 'c_531',
-            'name': 'Gastroenteritis',
-            'common_name': 'Stomach flu',
-            'probability': min(prob, 0.95),
-            'icd10': 'A09',
-            'matched': sum(1 for s in ['s_1967', 's_1970', 's_1969', 's_1968', 's_98'] if s in all_symptoms)
-        })
+    # Score all conditions at once: indicator row x symptom/condition matrices
+    indicators = symptom_indicators([all_symptoms])
+    probs, eligible = score_batch(indicators)
+    probs, eligible = probs[0], eligible[0]
+    matched = (indicators @ MATCH_MATRIX)[0]
     
-    # Coronary Disease (HIGH PRIORITY)
-    if 's_102' in all_symptoms:
-        prob = 0.40
-        if 's_1988' in all_symptoms: prob += 0.20
-        
-        conditions.append({
-            'id': 'c_49',
-            'name': 'Coronary artery disease',
-            'common_name': 'Heart disease',
-            'probability': min(prob, 0.85),
-            'icd10': 'I25.1',
-            'urgency': 'high',
-            'matched': sum(1 for s in ['s_102', 's_1988', 's_15'] if s in all_symptoms)
-        })
+    for k, spec in enumerate(CONDITION_SPECS):
+        if eligible[k]:
+            condition = {
+                'id': spec.id,
+                'name': spec.name,
+                'common_name': spec.common_name,
+                'probability': float(probs[k]),
+                'icd10': spec.icd10,
+                'matched': int(matched[k])
+            }
+            if spec.urgency:
+                condition['urgency'] = spec.urgency
+                if spec.urgency == 'high':
+                    has_high_urgency = True
+            conditions.append(condition)
     
     if not conditions:
         conditions.append({
@@ -231,13 +344,14 @@ def assess_conditions(symptoms, follow_up_data, pain_severity, duration, emergen
             'matched': len(all_symptoms)
         })
     
-    conditions.sort(key=lambda x: x['probability'], reverse=True)
+    # Only the top three are reported, so a partial heap selection is enough
+    conditions = heapq.nlargest(3, conditions, key=itemgetter('probability'))
     
     # Determine triage
-    if emergency or 's_102' in all_symptoms:
+    if emergency or 's_102' in sym_set:
         triage = 'emergency'
         triage_desc = 'Seek immediate medical attention'
-    elif pain_severity >= 8 or any(c.get('urgency') == 'high' for c in conditions):
+    elif pain_severity >= 8 or has_high_urgency:
         triage = 'consultation_24'
         triage_desc = 'Consult a healthcare provider within 24 hours'
     elif duration == 'More than a week':
@@ -248,77 +362,99 @@ def assess_conditions(symptoms, follow_up_data, pain_severity, duration, emergen
         triage_desc = 'Consider monitoring symptoms and rest'
     
     return {
-        'conditions': conditions[:3],
+        'conditions': conditions,
         'triage': triage,
         'triage_description': triage_desc,
         'all_symptoms': all_symptoms
     }
 
-def find_nearby_clinics(latitude, longitude, triage_level):
-    """Find nearby medical facilities using Google Places API"""
-    api_key = os.getenv('GOOGLE_PLACES_API_KEY', '')
-    
-    if not api_key:
-        return None
-    
-    # Determine search type based on triage
-    if triage_level == 'emergency':
-        search_type = 'hospital'
-        keyword = 'emergency room'
-    elif triage_level == 'consultation_24':
-        search_type = 'hospital'
-        keyword = 'urgent care'
-    else:
-        search_type = 'doctor'
-        keyword = 'clinic'
+@st.cache_resource(show_spinner=False)
+def _service_config():
+    """External service settings, read from the environment once per process"""
+    return {
+        'places_api_key': os.getenv('GOOGLE_PLACES_API_KEY', ''),
+        'sendgrid_api_key': os.getenv('SENDGRID_API_KEY', ''),
+        'sender_email': os.getenv('SENDER_EMAIL', 'noreply@medical-app.com')
+    }
+
+# (connect, read) timeout for outbound API calls, in seconds
+HTTP_TIMEOUT = (3, 10)
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Shared HTTP session so API calls reuse keep-alive connections"""
+    # Imported here so cold starts that never send email or search clinics skip it
+    import requests
     
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+    session = requests.Session()
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+# Google Places nearby search; (type, keyword) is chosen by triage level
+PLACES_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+PLACES_RADIUS = 5000
+TRIAGE_SEARCH = {
+    'emergency': ('hospital', 'emergency room'),
+    'consultation_24': ('hospital', 'urgent care'),
+}
+DEFAULT_SEARCH = ('doctor', 'clinic')
+
+class PlacesError(Exception):
+    """Google Places returned an error status (quota, denied, server error)"""
+
+# Facility listings change slowly; only OK and ZERO_RESULTS responses are cached,
+# so errors never outlive the request that hit them
+@st.cache_data(ttl=1800, show_spinner=False)
+def _places_lookup(lat_r, lon_r, radius, triage_level, api_key):
+    """Query Google Places for facilities near a rounded location (cached)"""
+    search_type, keyword = TRIAGE_SEARCH.get(triage_level, DEFAULT_SEARCH)
     params = {
-        'location': f"{latitude},{longitude}",
-        'radius': 5000,
+        'location': f"{lat_r},{lon_r}",
+        'radius': radius,
         'type': search_type,
         'keyword': keyword,
         'key': api_key
     }
     
-    try:
-        response = requests.get(url, params=params)
-        data = response.json()
-        
-        if data['status'] == 'OK':
-            return data['results'][:5]
-        else:
-            return None
-    except:
+    response = get_http_session().get(PLACES_URL, params=params, timeout=HTTP_TIMEOUT)
+    data = response.json()
+    
+    if data['status'] == 'OK':
+        # Places can list the same facility more than once; keep the first
+        unique = {}
+        for place in data['results']:
+            unique.setdefault(place['place_id'], place)
+        return list(unique.values())[:5]
+    elif data['status'] == 'ZERO_RESULTS':
         return None
+    else:
+        # Raised rather than returned so a transient failure is not cached
+        raise PlacesError(data['status'])
 
-def send_email_report(email, report):
-    """Send email using SendGrid API"""
+def find_nearby_clinics(latitude, longitude, triage_level, radius=PLACES_RADIUS):
+    """Find nearby medical facilities using Google Places API"""
+    api_key = _service_config()['places_api_key']
+    
+    if not api_key:
+        return None
+    
+    # Imported here, like get_http_session, so pages that never search skip it
+    import requests
+    
+    # Coordinates are quantized to ~100 m so nearby repeat searches share a cache entry.
+    # Network and API errors are raised out of the cached lookup so they are not memoized.
     try:
-        api_key = os.getenv('SENDGRID_API_KEY', '')
-        
-        if not api_key:
-            st.warning("⚠️ Email not configured. Report displayed but not sent.")
-            return False
-        
-        url = "https://api.sendgrid.com/v3/mail/send"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        symptoms_list = ', '.join(s['name'] for s in report['symptoms'])
-        
-        conditions_list = '\n'.join(
-            f"  {idx+1}. {c['name']} ({c.get('common_name', '')})\n"
-            f"     Match: {int(c['probability']*100)}%\n"
-            f"     ICD-10: {c['icd10']}"
-            for idx, c in enumerate(report['conditions'])
-        )
-        
-        email_body = f"""
+        return _places_lookup(round(latitude, 3), round(longitude, 3), radius, triage_level, api_key)
+    except (PlacesError, requests.RequestException, ValueError, KeyError):
+        return None
+
+# Minimal address shape check for the assessment form
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Plain-text email report, filled in with str.format_map
+EMAIL_TEMPLATE = """
 MEDICAL PRE-SCREENING REPORT
-Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+Generated: {generated}
 
 ⚠️ IMPORTANT DISCLAIMER ⚠️
 This is NOT a medical diagnosis and does NOT replace professional medical advice.
@@ -327,15 +463,15 @@ Always consult a licensed healthcare provider for actual diagnosis and treatment
 ═══════════════════════════════════════
 
 TRIAGE RECOMMENDATION:
-{report['triage_description'].upper()}
+{triage}
 
 ═══════════════════════════════════════
 
 PATIENT INFORMATION:
-  Age: {report['patient']['age']} years
-  Sex: {report['patient']['sex'].capitalize()}
-  Pain Severity: {report['patient']['pain_severity']}/10
-  Symptom Duration: {report['patient']['duration']}
+  Age: {age} years
+  Sex: {sex}
+  Pain Severity: {pain_severity}/10
+  Symptom Duration: {duration}
 
 ═══════════════════════════════════════
 
@@ -354,34 +490,192 @@ POSSIBLE ASSOCIATED CONDITIONS:
 This assessment uses clinical decision support methodology.
 All conditions are coded using ICD-10 standards.
 """
+
+class SendGridError(Exception):
+    """SendGrid rejected the send (any status other than 202 Accepted)"""
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _send_once(key, _email, _body, _api_key):
+    """POST a report to SendGrid at most once per idempotency key.
+    
+    Only successful sends are cached; failures raise so they can be retried.
+    """
+    data = {
+        "personalizations": [{
+            "to": [{"email": _email}],
+            "subject": "Your Medical Pre-Screening Report"
+        }],
+        "from": {
+            "email": _service_config()['sender_email'],
+            "name": "Medical Pre-Screening System"
+        },
+        "content": [{
+            "type": "text/plain",
+            "value": _body
+        }]
+    }
+    headers = {
+        "Authorization": f"Bearer {_api_key}"
+    }
+    
+    response = get_http_session().post(
+        "https://api.sendgrid.com/v3/mail/send", headers=headers, json=data, timeout=HTTP_TIMEOUT
+    )
+    
+    if response.status_code != 202:
+        raise SendGridError(f"SendGrid error ({response.status_code}): {response.text}")
+    return True
+
+def send_email_report(email, report):
+    """Send email using SendGrid API"""
+    api_key = _service_config()['sendgrid_api_key']
+    
+    # Bail out before building the body or loading the HTTP client when unconfigured
+    if not api_key:
+        st.warning("⚠️ Email not configured. Report displayed but not sent.")
+        return False
+    
+    try:
+        patient = report['patient']
+        conditions_list = '\n'.join([
+            f"  {idx}. {c['name']} ({c.get('common_name', '')})\n"
+            f"     Match: {int(c['probability']*100)}%\n"
+            f"     ICD-10: {c['icd10']}"
+            for idx, c in enumerate(report['conditions'], 1)
+        ])
+        
+        email_body = EMAIL_TEMPLATE.format_map({
+            'generated': datetime.now().strftime('%B %d, %Y at %I:%M %p'),
+            'triage': report['triage_description'].upper(),
+            'age': patient['age'],
+            'sex': patient['sex'].capitalize(),
+            'pain_severity': patient['pain_severity'],
+            'duration': patient['duration'],
+            'symptoms_list': ', '.join([s['name'] for s in report['symptoms']]),
+            'conditions_list': conditions_list
+        })
         
-        data = {
-            "personalizations": [{
-                "to": [{"email": email}],
-                "subject": "Your Medical Pre-Screening Report"
-            }],
-            "from": {
-                "email": os.getenv('SENDER_EMAIL', 'noreply@medical-app.com'),
-                "name": "Medical Pre-Screening System"
-            },
-            "content": [{
-                "type": "text/plain",
-                "value": email_body
-            }]
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        
-        if response.status_code == 202:
-            return True
-        else:
-            st.error(f"SendGrid error ({response.status_code}): {response.text}")
-            return False
-            
+        # One send per (report, recipient), however many times the page reruns
+        key = hashlib.sha256((report['timestamp'] + email).encode()).hexdigest()
+        return _send_once(key, email, email_body, api_key)
+    
+    except SendGridError as e:
+        st.error(str(e))
+        return False
     except Exception as e:
         st.error(f"Email system error: {str(e)}")
         return False
 
+# ==================== REPORT VIEW ====================
+def render_report(report, form_data, email_sent):
+    """Render the finished report from the stored report and clinic search"""
+    st.success("✅ Assessment Complete")
+    
+    if email_sent:
+        st.info(f"📧 Report sent to {form_data['email']}")
+    
+    if report['follow_up_used']:
+        st.info("✓ Enhanced assessment using clinical decision support questions")
+    
+    # Triage recommendation
+    triage_colors = {
+        'emergency': '🔴',
+        'consultation_24': '🟠',
+        'consultation': '🟡',
+        'self_care': '🟢'
+    }
+    
+    st.header(f"{triage_colors.get(report['triage'], '🔵')} Recommended Action")
+    st.warning(f"**{report['triage_description']}**")
+    
+    # ==================== CLINIC FINDER ====================
+    st.divider()
+    st.header("📍 Find Nearby Medical Facilities")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        user_lat = st.number_input("Your Latitude", value=40.7128, format="%.4f", help="Enable location services or enter manually")
+    with col2:
+        user_lon = st.number_input("Your Longitude", value=-74.0060, format="%.4f", help="Enable location services or enter manually")
+    
+    if st.button("🔍 Find Nearby Facilities", type="primary"):
+        with st.spinner("Searching for medical facilities..."):
+            st.session_state.clinics = find_nearby_clinics(user_lat, user_lon, report['triage'])
+    
+    # Results stay in session state so later reruns redraw them without another search
+    if 'clinics' in st.session_state:
+        clinics = st.session_state.clinics
+        if clinics:
+            st.success(f"Found {len(clinics)} facilities near you:")
+            
+            # One markdown block for the whole list rather than several elements per facility
+            entries = []
+            for idx, clinic in enumerate(clinics, 1):
+                lines = [f"**{idx}. {clinic['name']}**", f"📍 **Address**: {clinic.get('vicinity', 'N/A')}"]
+                if 'rating' in clinic:
+                    lines.append(f"⭐ **Rating**: {clinic['rating']}/5")
+                if 'opening_hours' in clinic:
+                    status = "🟢 Open Now" if clinic['opening_hours'].get('open_now') else "🔴 Closed"
+                    lines.append(f"**Status**: {status}")
+                location = clinic['geometry']['location']
+                lines.append(f"[🗺️ Open in Google Maps](https://www.google.com/maps/search/?api=1&query={location['lat']},{location['lng']}&query_place_id={clinic['place_id']})")
+                entries.append("  \n".join(lines))
+            st.markdown("\n\n".join(entries))
+        else:
+            st.warning("⚠️ Could not find nearby facilities. Please check your location or configure Google Places API key.")
+            st.caption("To enable this feature, add GOOGLE_PLACES_API_KEY to Streamlit secrets.")
+    
+    st.caption("💡 **Tip**: Enable location services in your browser for automatic location detection")
+    
+    st.divider()
+    
+    # Patient info
+    st.header("Patient Information")
+    st.write(f"**Age:** {form_data['age']}")
+    st.write(f"**Sex:** {form_data['sex']}")
+    st.write(f"**Pain Severity:** {form_data['pain_severity']}/10")
+    st.write(f"**Symptom Duration:** {form_data['duration']}")
+    st.write(f"**Assessment Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    # Symptoms
+    st.header("Reported Symptoms")
+    symptom_names = [s['name'] for s in report['symptoms']]
+    st.write(", ".join(symptom_names))
+    
+    # Body regions affected
+    regions_affected = list(dict.fromkeys(s['region'] for s in report['symptoms']))
+    st.write(f"**Affected body regions:** {', '.join(BODY_REGION_NAMES[r] for r in regions_affected)}")
+    
+    # Conditions
+    st.header("Possible Associated Conditions")
+    st.caption("These are potential conditions based on reported symptoms. This is NOT a diagnosis.")
+    
+    condition_rows = [
+        "| # | Condition | ICD-10 Code | Matched Symptoms | Match |",
+        "|---|---|---|---|---|"
+    ]
+    for idx, condition in enumerate(report['conditions'], 1):
+        name = f"**{condition['name']}**"
+        if condition.get('common_name'):
+            name += f" ({condition['common_name']})"
+        condition_rows.append(
+            f"| {idx} | {name} | {condition['icd10']} | "
+            f"{condition['matched']} of {len(report['symptoms'])} | {int(condition['probability'] * 100)}% |"
+        )
+    st.markdown("\n".join(condition_rows))
+    
+    # Important notes
+    st.warning(NOTES_MD)
+    
+    if st.button("🔄 Start New Assessment", type="primary", use_container_width=True):
+        st.session_state.step = 'form'
+        st.session_state.selected_symptoms = []
+        st.session_state.follow_up_answers = {}
+        st.session_state.body_regions = []
+        st.session_state.report = None
+        st.session_state.pop('clinics', None)
+        st.rerun()
+
 # ==================== SIDEBAR NAVIGATION ====================
 with st.sidebar:
     st.title("🏥 Navigation")
@@ -406,21 +700,24 @@ if page == "Analytics Dashboard":
         st.info("No assessment data yet. Complete some assessments to see analytics.")
     else:
         # Summary metrics
+        total = len(st.session_state.assessment_history)
+        triage_counts = st.session_state.triage_counter
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Assessments", len(st.session_state.assessment_history))
+            st.metric("Total Assessments", total)
         
         with col2:
-            emergency_count = sum(1 for a in st.session_state.assessment_history if a.get('triage') == 'emergency')
-            st.metric("Emergency Cases", emergency_count, delta=f"{emergency_count/len(st.session_state.assessment_history)*100:.1f}%")
+            emergency_count = triage_counts['emergency']
+            st.metric("Emergency Cases", emergency_count, delta=f"{emergency_count/total*100:.1f}%")
         
         with col3:
-            avg_age = sum(a['patient']['age'] for a in st.session_state.assessment_history) / len(st.session_state.assessment_history)
+            avg_age = st.session_state.age_sum / total
             st.metric("Average Age", f"{avg_age:.0f} years")
         
         with col4:
-            avg_symptoms = sum(len(a['symptoms']) for a in st.session_state.assessment_history) / len(st.session_state.assessment_history)
+            avg_symptoms = st.session_state.symptom_total / total
             st.metric("Avg Symptoms", f"{avg_symptoms:.1f}")
         
         st.divider()
@@ -430,7 +727,6 @@ if page == "Analytics Dashboard":
         
         with col1:
             st.subheader("Triage Distribution")
-            triage_counts = Counter(a.get('triage', 'unknown') for a in st.session_state.assessment_history)
             
             triage_labels = {
                 'emergency': '🔴 Emergency',
@@ -441,34 +737,22 @@ if page == "Analytics Dashboard":
             
             for triage_type, label in triage_labels.items():
                 count = triage_counts.get(triage_type, 0)
-                pct = (count / len(st.session_state.assessment_history) * 100) if count > 0 else 0
+                pct = (count / total * 100) if count > 0 else 0
                 st.write(f"{label}: **{count}** ({pct:.1f}%)")
                 st.progress(pct / 100)
         
         with col2:
             st.subheader("Top Conditions Identified")
-            all_conditions = []
-            for assessment in st.session_state.assessment_history:
-                for condition in assessment.get('conditions', []):
-                    all_conditions.append(condition['name'])
-            
-            condition_counts = Counter(all_conditions)
-            for condition, count in condition_counts.most_common(5):
+            for condition, count in st.session_state.condition_counter.most_common(5):
                 st.write(f"**{condition}**: {count} cases")
         
         st.divider()
         
         # Symptom heatmap
         st.subheader("Most Reported Symptoms")
-        all_symptoms = []
-        for assessment in st.session_state.assessment_history:
-            for symptom in assessment.get('symptoms', []):
-                all_symptoms.append(symptom['name'])
-        
-        symptom_counts = Counter(all_symptoms)
         
         col1, col2 = st.columns(2)
-        for idx, (symptom, count) in enumerate(symptom_counts.most_common(10)):
+        for idx, (symptom, count) in enumerate(st.session_state.symptom_counter.most_common(10)):
             with col1 if idx < 5 else col2:
                 st.write(f"{idx+1}. **{symptom}**: {count}")
         
@@ -479,45 +763,22 @@ if page == "Analytics Dashboard":
         
         with col1:
             st.subheader("Age Distribution")
-            age_groups = {'0-17': 0, '18-35': 0, '36-50': 0, '51-65': 0, '65+': 0}
-            for assessment in st.session_state.assessment_history:
-                age = assessment['patient']['age']
-                if age < 18:
-                    age_groups['0-17'] += 1
-                elif age < 36:
-                    age_groups['18-35'] += 1
-                elif age < 51:
-                    age_groups['36-50'] += 1
-                elif age < 66:
-                    age_groups['51-65'] += 1
-                else:
-                    age_groups['65+'] += 1
-            
-            for group, count in age_groups.items():
-                pct = (count / len(st.session_state.assessment_history) * 100) if count > 0 else 0
+            for group, count in zip(AGE_BUCKET_LABELS, st.session_state.age_bucket_counts):
+                pct = (count / total * 100) if count > 0 else 0
                 st.write(f"{group}: {count} ({pct:.1f}%)")
         
         with col2:
             st.subheader("Sex Distribution")
-            sex_counts = Counter(a['patient']['sex'] for a in st.session_state.assessment_history)
-            for sex, count in sex_counts.items():
-                pct = (count / len(st.session_state.assessment_history) * 100)
+            for sex, count in st.session_state.sex_counter.items():
+                pct = (count / total * 100)
                 st.write(f"{sex.capitalize()}: {count} ({pct:.1f}%)")
         
         st.divider()
         
         # Body region analysis
         st.subheader("Affected Body Regions")
-        all_regions = []
-        for assessment in st.session_state.assessment_history:
-            for symptom in assessment.get('symptoms', []):
-                region = next((s['region'] for s in SYMPTOMS if s['id'] == symptom.get('id')), None)
-                if region:
-                    all_regions.append(region)
-        
-        region_counts = Counter(all_regions)
-        for region, count in region_counts.most_common():
-            st.write(f"**{BODY_REGIONS[region]['name']}**: {count} symptoms")
+        for region, count in st.session_state.region_counter.most_common():
+            st.write(f"**{BODY_REGION_NAMES[region]}**: {count} symptoms")
         
         st.divider()
         st.caption("💡 **Note**: All data is session-based and not permanently stored for privacy compliance.")
@@ -553,72 +814,70 @@ elif page == "Patient Assessment":
                     st.rerun()
         
         if st.session_state.body_regions:
-            st.info(f"✓ Filtering symptoms for: {', '.join(BODY_REGIONS[r]['name'] for r in st.session_state.body_regions)}")
+            st.info(f"✓ Filtering symptoms for: {', '.join(BODY_REGION_NAMES[r] for r in st.session_state.body_regions)}")
             if st.button("Clear body region filter"):
                 st.session_state.body_regions = []
                 st.rerun()
         
         st.divider()
         
-        st.header("Patient Information")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            age = st.number_input("Age *", min_value=1, max_value=120, value=30)
-        
-        with col2:
-            sex = st.selectbox("Sex *", ["", "Male", "Female"])
-        
-        with col3:
-            duration = st.selectbox("Symptom Duration *", [
-                "",
-                "Less than 24 hours",
-                "1-3 days",
-                "4-7 days",
-                "More than a week"
-            ])
-        
-        email = st.text_input("Email Address *", placeholder="your.email@example.com")
-        
-        pain_severity = st.slider("Pain Severity", 0, 10, 5)
-        
-        emergency = st.checkbox("⚠️ I am experiencing emergency symptoms (chest pain, difficulty breathing, severe bleeding)")
-        
-        st.header("Select Your Symptoms")
+        # Batch the patient and symptom inputs so edits don't rerun the script
+        with st.form("assessment_form"):
+            st.header("Patient Information")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                age = st.number_input("Age *", min_value=1, max_value=120, value=30)
+            
+            with col2:
+                sex = st.selectbox("Sex *", ["", "Male", "Female"])
+            
+            with col3:
+                duration = st.selectbox("Symptom Duration *", [
+                    "",
+                    "Less than 24 hours",
+                    "1-3 days",
+                    "4-7 days",
+                    "More than a week"
+                ])
+            
+            email = st.text_input("Email Address *", placeholder="your.email@example.com")
+            
+            pain_severity = st.slider("Pain Severity", 0, 10, 5)
+            
+            emergency = st.checkbox("⚠️ I am experiencing emergency symptoms (chest pain, difficulty breathing, severe bleeding)")
+            
+            st.header("Select Your Symptoms")
+            
+            # Group symptoms by category, filtered by body region if selected
+            if st.session_state.body_regions:
+                layout = grouped_symptoms(tuple(sorted(st.session_state.body_regions)))
+            else:
+                layout = CATEGORY_LAYOUT
+            
+            selected_symptoms = []
+            
+            for col, column_categories in zip(st.columns(3), layout):
+                with col:
+                    for category, symptom_ids in column_categories:
+                        selected_symptoms.extend(st.multiselect(
+                            f"**{category}**",
+                            options=symptom_ids,
+                            format_func=lambda sid: SYMPTOM_BY_ID[sid]['name'],
+                            key=f"ms_{category}"
+                        ))
+            
+            submitted = st.form_submit_button("Continue →", type="primary", use_container_width=True)
         
-        # Filter symptoms by body region if selected
-        if st.session_state.body_regions:
-            filtered_symptoms = [s for s in SYMPTOMS if s['region'] in st.session_state.body_regions]
-        else:
-            filtered_symptoms = SYMPTOMS
-        
-        # Group symptoms by category
-        categories = {}
-        for symptom in filtered_symptoms:
-            cat = symptom['category']
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(symptom)
-        
-        selected_symptoms = []
-        
-        for category, symptom_list in categories.items():
-            with st.expander(f"**{category}**", expanded=True):
-                cols = st.columns(3)
-                for idx, symptom in enumerate(symptom_list):
-                    with cols[idx % 3]:
-                        if st.checkbox(symptom['name'], key=symptom['id']):
-                            selected_symptoms.append(symptom['id'])
-        
-        st.info(f"✓ Selected {len(selected_symptoms)} symptom(s)")
-        
-        if st.button("Continue →", type="primary", use_container_width=True):
-            if not age or not sex or not email or not duration:
+        if submitted:
+            # Pasted addresses often carry stray whitespace
+            email = email.strip()
+            if not sex or not duration or not email:
                 st.error("Please fill all required fields")
-            elif len(selected_symptoms) == 0:
+            elif not selected_symptoms:
                 st.error("Please select at least one symptom")
-            elif '@' not in email:
+            elif not _EMAIL_RE.match(email):
                 st.error("Please enter a valid email")
             else:
                 st.session_state.form_data = {
@@ -631,7 +890,7 @@ elif page == "Patient Assessment":
                 }
                 st.session_state.selected_symptoms = selected_symptoms
                 
-                follow_ups = generate_follow_up_questions(selected_symptoms)
+                follow_ups = generate_follow_up_questions(tuple(sorted(set(selected_symptoms))))
                 
                 if follow_ups:
                     st.session_state.follow_up_questions = follow_ups
@@ -693,141 +952,34 @@ elif page == "Patient Assessment":
     elif st.session_state.step == 'report':
         
         form_data = st.session_state.form_data
-        assessment = assess_conditions(
-            st.session_state.selected_symptoms,
-            st.session_state.follow_up_answers,
-            form_data['pain_severity'],
-            form_data['duration'],
-            form_data['emergency']
-        )
         
-        report = {
-            'timestamp': datetime.now().isoformat(),
-            'patient': form_data,
-            'symptoms': [s for s in SYMPTOMS if s['id'] in assessment['all_symptoms']],
-            'conditions': assessment['conditions'],
-            'triage': assessment['triage'],
-            'triage_description': assessment['triage_description'],
-            'follow_up_used': len(st.session_state.follow_up_answers) > 0
-        }
+        # Build and record the report once; later reruns of this page reuse it
+        if st.session_state.report is None:
+            assessment = assess_conditions(
+                tuple(st.session_state.selected_symptoms),
+                tuple(st.session_state.follow_up_answers.items()),
+                form_data['pain_severity'],
+                form_data['duration'],
+                form_data['emergency']
+            )
+            
+            report = {
+                'timestamp': datetime.now().isoformat(),
+                'patient': form_data,
+                'symptoms': [SYMPTOM_BY_ID[sid] for sid in assessment['all_symptoms'] if sid in SYMPTOM_BY_ID],
+                'conditions': assessment['conditions'],
+                'triage': assessment['triage'],
+                'triage_description': assessment['triage_description'],
+                'follow_up_used': len(st.session_state.follow_up_answers) > 0
+            }
+            
+            st.session_state.report = report
+            _record_assessment(report)
         
-        st.session_state.report = report
-        st.session_state.assessment_history.append(report)
+        report = st.session_state.report
         
         email_sent = send_email_report(form_data['email'], report)
-        
-        st.success("✅ Assessment Complete")
-        
-        if email_sent:
-            st.info(f"📧 Report sent to {form_data['email']}")
-        
-        if report['follow_up_used']:
-            st.info("✓ Enhanced assessment using clinical decision support questions")
-        
-        # Triage recommendation
-        triage_colors = {
-            'emergency': '🔴',
-            'consultation_24': '🟠',
-            'consultation': '🟡',
-            'self_care': '🟢'
-        }
-        
-        st.header(f"{triage_colors.get(report['triage'], '🔵')} Recommended Action")
-        st.warning(f"**{report['triage_description']}**")
-        
-        # ==================== CLINIC FINDER ====================
-        st.divider()
-        st.header("📍 Find Nearby Medical Facilities")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            user_lat = st.number_input("Your Latitude", value=40.7128, format="%.4f", help="Enable location services or enter manually")
-        with col2:
-            user_lon = st.number_input("Your Longitude", value=-74.0060, format="%.4f", help="Enable location services or enter manually")
-        
-        if st.button("🔍 Find Nearby Facilities", type="primary"):
-            with st.spinner("Searching for medical facilities..."):
-                clinics = find_nearby_clinics(user_lat, user_lon, report['triage'])
-                
-                if clinics:
-                    st.success(f"Found {len(clinics)} facilities near you:")
-                    
-                    for idx, clinic in enumerate(clinics):
-                        with st.expander(f"**{idx+1}. {clinic['name']}**", expanded=(idx==0)):
-                            st.write(f"📍 **Address**: {clinic.get('vicinity', 'N/A')}")
-                            
-                            if 'rating' in clinic:
-                                st.write(f"⭐ **Rating**: {clinic['rating']}/5")
-                            
-                            if 'opening_hours' in clinic:
-                                status = "🟢 Open Now" if clinic['opening_hours'].get('open_now') else "🔴 Closed"
-                                st.write(f"**Status**: {status}")
-                            
-                            # Google Maps link
-                            maps_url = f"https://www.google.com/maps/search/?api=1&query={clinic['geometry']['location']['lat']},{clinic['geometry']['location']['lng']}&query_place_id={clinic['place_id']}"
-                            st.link_button("🗺️ Open in Google Maps", maps_url)
-                else:
-                    st.warning("⚠️ Could not find nearby facilities. Please check your location or configure Google Places API key.")
-                    st.caption("To enable this feature, add GOOGLE_PLACES_API_KEY to Streamlit secrets.")
-        
-        st.caption("💡 **Tip**: Enable location services in your browser for automatic location detection")
-        
-        st.divider()
-        
-        # Patient info
-        st.header("Patient Information")
-        st.write(f"**Age:** {form_data['age']}")
-        st.write(f"**Sex:** {form_data['sex']}")
-        st.write(f"**Pain Severity:** {form_data['pain_severity']}/10")
-        st.write(f"**Symptom Duration:** {form_data['duration']}")
-        st.write(f"**Assessment Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        # Symptoms
-        st.header("Reported Symptoms")
-        symptom_names = [s['name'] for s in report['symptoms']]
-        st.write(", ".join(symptom_names))
-        
-        # Body regions affected
-        regions_affected = list(set(s['region'] for s in report['symptoms']))
-        st.write(f"**Affected body regions:** {', '.join(BODY_REGIONS[r]['name'] for r in regions_affected)}")
-        
-        # Conditions
-        st.header("Possible Associated Conditions")
-        st.caption("These are potential conditions based on reported symptoms. This is NOT a diagnosis.")
-        
-        for idx, condition in enumerate(report['conditions']):
-            with st.container():
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    st.subheader(f"{idx + 1}. {condition['name']}")
-                    if condition.get('common_name'):
-                        st.caption(f"({condition['common_name']})")
-                    st.write(f"**ICD-10 Code:** {condition['icd10']}")
-                    st.write(f"**Matched Symptoms:** {condition['matched']} of {len(report['symptoms'])}")
-                
-                with col2:
-                    st.metric("Match", f"{int(condition['probability'] * 100)}%")
-                
-                st.divider()
-        
-        # Important notes
-        st.warning("""
-        **Important Notes:**
-        - This assessment uses clinical decision support algorithms
-        - Body map helps identify location-specific conditions
-        - Follow-up questions improve diagnostic accuracy by 15-30%
-        - Symptom IDs and condition codes follow medical standards (ICD-10)
-        - Only a licensed healthcare provider can provide an actual diagnosis
-        """)
-        
-        if st.button("🔄 Start New Assessment", type="primary", use_container_width=True):
-            st.session_state.step = 'form'
-            st.session_state.selected_symptoms = []
-            st.session_state.follow_up_answers = {}
-            st.session_state.body_regions = []
-            st.session_state.report = None
-            st.rerun()
+        render_report(report, form_data, email_sent)
 
 # Footer
 st.divider()